@@ -4,6 +4,10 @@ Uses src.chat to send your text to the local model and stream the reply back.
 """
 import logging
 import os
+import queue
+import threading
+import time
+from typing import Any, Iterator
 
 import streamlit as st
 
@@ -21,6 +25,68 @@ def _model_display_name() -> str:
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# Minimum time between two redraws of the streaming answer (~one frame at 60fps)
+RENDER_INTERVAL_SECONDS = 0.016
+
+
+def _render_stream(stream: Iterator[str], placeholder: Any) -> str:
+    """
+    Render an LLM stream into placeholder and return the full response text.
+    A background thread reads the stream into a queue so network reads are never blocked
+    by Streamlit redraws; this thread drains the queue and redraws at most every
+    RENDER_INTERVAL_SECONDS, then always renders the final text. Text that arrives just after
+    a redraw is shown once the interval has passed, even if no further chunk arrives.
+    """
+    chunks: "queue.Queue[Any]" = queue.Queue()
+    end_of_stream = object()
+    errors: list[BaseException] = []
+
+    def _read() -> None:
+        try:
+            for chunk in stream:
+                chunks.put(chunk)
+        except BaseException as e:
+            errors.append(e)
+        finally:
+            chunks.put(end_of_stream)
+
+    threading.Thread(target=_read, daemon=True).start()
+
+    parts: list[str] = []
+    rendered = 0  # len(parts) at the last redraw
+    last_render = 0.0
+    finished = False
+    while not finished:
+        # Wait for more text, but only until the next redraw is due if text is pending
+        timeout = None
+        if len(parts) > rendered:
+            timeout = max(0.0, last_render + RENDER_INTERVAL_SECONDS - time.monotonic())
+        try:
+            item = chunks.get(timeout=timeout)
+        except queue.Empty:
+            item = None
+        # Take everything that arrived since the last redraw
+        while item is not None:
+            if item is end_of_stream:
+                finished = True
+                break
+            parts.append(item)
+            try:
+                item = chunks.get_nowait()
+            except queue.Empty:
+                item = None
+        now = time.monotonic()
+        if len(parts) > rendered and not finished and now - last_render >= RENDER_INTERVAL_SECONDS:
+            placeholder.markdown("".join(parts) + "▌")
+            rendered = len(parts)
+            last_render = now
+
+    response_text = "".join(parts)
+    placeholder.markdown(response_text)
+    if errors:
+        raise errors[0]
+    return response_text
+
 st.set_page_config(page_title="Chatbot", page_icon="🤖", layout="centered")
 
 st.markdown(
@@ -107,35 +173,39 @@ if prompt := st.chat_input("Type your message here..."):
 
     # Optional: get context from uploaded documents (RAG)
     context = ""
+    query_embedding = None
     if st.session_state["use_rag"]:
         with st.spinner("Searching your documents..."):
             context = get_rag_context(prompt, top_k=st.session_state["rag_top_k"])
+        if context:
+            from src.embeddings import get_query_embedding
+
+            # Already computed for retrieval (lru-cached); reused for the semantic response cache
+            query_embedding = get_query_embedding(prompt)
 
     # Stream assistant reply
     with st.chat_message("assistant"):
         response_placeholder = st.empty()
-        response_text = ""
 
         stream = generate_response_streaming(
             prompt,
             chat_history=st.session_state["chat_history"][:-1],  # exclude current prompt
             temperature=st.session_state["temperature"],
             context=context if context else None,
+            query_embedding=query_embedding,
         )
 
         if stream is not None:
-            for chunk in stream:
-                # Ollama stream: chunk can be dict with ["message"]["content"] or object with .message.content
-                part = ""
-                if isinstance(chunk, dict):
-                    msg = chunk.get("message") or chunk
-                    part = msg.get("content", "") if isinstance(msg, dict) else ""
-                elif hasattr(chunk, "message"):
-                    part = getattr(chunk.message, "content", "") or ""
-                if part:
-                    response_text += part
-                    response_placeholder.markdown(response_text + "▌")
-            response_placeholder.markdown(response_text)
-            st.session_state["chat_history"].append({"role": "assistant", "content": response_text})
+            try:
+                response_text = _render_stream(stream, response_placeholder)
+            except Exception as e:
+                # Partial text stays on screen but is not kept as an assistant turn
+                logger.error(f"LLM stream failed: {e}")
+                st.error(f"The LLM response was interrupted: {e}")
+            else:
+                if response_text:
+                    st.session_state["chat_history"].append(
+                        {"role": "assistant", "content": response_text}
+                    )
         else:
             st.error("Failed to get a response from the LLM. Check that Ollama is running and the model is available.")
@@ -4,19 +4,16 @@ Documents are then searchable for RAG in the Chatbot (when RAG is enabled).
 """
 import logging
 import os
+import shutil
 import time
-from typing import TYPE_CHECKING
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
 
 import streamlit as st
 
-from src.constants import OPENSEARCH_INDEX, TEXT_CHUNK_SIZE
+from src.constants import OPENSEARCH_INDEX, TEXT_CHUNK_TOKENS
 from src.utils import setup_logging
 
-# Lazy imports: only load heavy dependencies when the page is actually rendered
-# This prevents Streamlit from importing them during page discovery at startup
-if TYPE_CHECKING:
-    from PyPDF2 import PdfReader
-
 setup_logging()
 logger = logging.getLogger(__name__)
 
@@ -66,12 +63,13 @@ st.sidebar.markdown(
 
 
 def save_uploaded_file(uploaded_file) -> str:
-    """Save an uploaded file to uploaded_files/ and return its path."""
+    """Save an uploaded file to uploaded_files/ and return its path (copied in 1MB blocks)."""
     upload_dir = "uploaded_files"
     os.makedirs(upload_dir, exist_ok=True)
     file_path = os.path.join(upload_dir, uploaded_file.name)
+    uploaded_file.seek(0)
     with open(file_path, "wb") as f:
-        f.write(uploaded_file.getbuffer())
+        shutil.copyfileobj(uploaded_file, f, length=1024 * 1024)
     logger.info(f"File '{uploaded_file.name}' saved to '{file_path}'.")
     return file_path
 
@@ -83,8 +81,6 @@ def render_upload_page() -> None:
     and delete (from disk + OpenSearch).
     """
     # Lazy imports: only load when page is rendered (not during Streamlit page discovery)
-    from PyPDF2 import PdfReader
-    
     from src.embeddings import generate_embeddings, get_embedding_model
     from src.ingestion import (
         bulk_index_documents,
@@ -92,7 +88,8 @@ def render_upload_page() -> None:
         delete_documents_by_document_name,
     )
     from src.opensearch import get_opensearch_client
-    from src.utils import chunk_text_by_characters
+    from src.pdf import extract_texts
+    from src.utils import chunk_text_by_tokens
     
     st.title("Upload Documents")
 
@@ -119,40 +116,41 @@ def render_upload_page() -> None:
     if "documents" not in st.session_state:
         st.session_state["documents"] = []
 
-    # Load list of document names already in the index
+    # Load list of document names (and their extracted character counts) already in the index
     query = {
         "size": 0,
-        "aggs": {"unique_docs": {"terms": {"field": "document_name", "size": 10000}}},
+        "aggs": {
+            "unique_docs": {
+                "terms": {"field": "document_name", "size": 10000},
+                "aggs": {"char_count": {"max": {"field": "char_count"}}},
+            }
+        },
     }
     try:
         response = client.search(index=index_name, body=query)
         buckets = response["aggregations"]["unique_docs"]["buckets"]
-        document_names = [b["key"] for b in buckets]
     except Exception as e:
         logger.warning(f"Could not list documents from OpenSearch: {e}")
-        document_names = []
+        buckets = []
+    document_names = [b["key"] for b in buckets]
 
     logger.info("Retrieved document names from OpenSearch.")
 
-    # Build session state documents from index + local files
+    # Build session state documents from the index response alone (PDFs are not re-read)
     st.session_state["documents"] = []
-    for document_name in document_names:
-        file_path = os.path.join(upload_dir, document_name)
-        if os.path.exists(file_path):
-            try:
-                reader = PdfReader(file_path)
-                text = "".join([page.extract_text() or "" for page in reader.pages])
-            except Exception as e:
-                logger.warning(f"Could not read {file_path}: {e}")
-                text = ""
-            st.session_state["documents"].append(
-                {"filename": document_name, "content": text, "file_path": file_path}
-            )
-        else:
-            st.session_state["documents"].append(
-                {"filename": document_name, "content": "", "file_path": None}
-            )
+    for bucket in buckets:
+        document_name = bucket["key"]
+        local_path = os.path.join(upload_dir, document_name)
+        file_path: Optional[str] = local_path if os.path.exists(local_path) else None
+        if file_path is None:
             logger.warning(f"File '{document_name}' does not exist locally.")
+        st.session_state["documents"].append(
+            {
+                "filename": document_name,
+                "char_count": int(bucket["char_count"]["value"] or 0),
+                "file_path": file_path,
+            }
+        )
 
     if "deleted_file" in st.session_state:
         st.success(
@@ -186,52 +184,63 @@ def render_upload_page() -> None:
                     )
                     st.stop()
         with st.spinner("Uploading and processing documents. Please wait..."):
+            new_files: List[Tuple[str, str]] = []
             for uploaded_file in uploaded_files:
-                if uploaded_file.name in document_names:
+                if uploaded_file.name in document_names or any(
+                    uploaded_file.name == name for name, _ in new_files
+                ):
                     st.warning(
                         f"The file '{uploaded_file.name}' already exists in the index."
                     )
                     continue
+                new_files.append((uploaded_file.name, save_uploaded_file(uploaded_file)))
 
-                file_path = save_uploaded_file(uploaded_file)
-                try:
-                    reader = PdfReader(file_path)
-                    text = "".join([page.extract_text() or "" for page in reader.pages])
-                except Exception as e:
-                    st.error(f"Could not read PDF {uploaded_file.name}: {e}")
+            # Extract all PDFs in parallel
+            extracted = extract_texts([file_path for _, file_path in new_files])
+            tokenizer = get_embedding_model().tokenizer
+            pending = []
+            for (name, file_path), (text, error) in zip(new_files, extracted):
+                if error is not None:
+                    st.error(f"Could not read PDF {name}: {error}")
                     continue
 
                 if not text.strip():
-                    st.warning(
-                        f"No text extracted from '{uploaded_file.name}'. Skipping."
-                    )
+                    st.warning(f"No text extracted from '{name}'. Skipping.")
                     continue
 
-                chunks = chunk_text_by_characters(
-                    text, chunk_size=TEXT_CHUNK_SIZE, overlap=100
+                chunks = chunk_text_by_tokens(
+                    text, tokenizer, max_tokens=TEXT_CHUNK_TOKENS, overlap=32
                 )
-                embeddings = generate_embeddings(chunks)
+                pending.append((name, file_path, len(text), chunks))
 
-                documents_to_index = [
-                    {
-                        "doc_id": f"{uploaded_file.name}_{i}",
-                        "text": chunk,
-                        "embedding": emb,
-                        "document_name": uploaded_file.name,
-                    }
-                    for i, (chunk, emb) in enumerate(zip(chunks, embeddings))
-                ]
-                bulk_index_documents(documents_to_index)
+            # Pipeline: embed document k+1 (CPU/GPU) while document k is bulk-indexed (network).
+            # At most one document waits on indexing, which bounds memory.
+            with ThreadPoolExecutor(max_workers=1) as index_executor:
+                index_future = None
+                for name, _, char_count, chunks in pending:
+                    embeddings = generate_embeddings(chunks)
+                    if index_future is not None:
+                        index_future.result()
+                    index_future = index_executor.submit(
+                        bulk_index_documents,
+                        embeddings,
+                        chunks,
+                        name,
+                        char_count=char_count,
+                    )
+                if index_future is not None:
+                    index_future.result()
 
+            for name, file_path, char_count, _ in pending:
                 st.session_state["documents"].append(
                     {
-                        "filename": uploaded_file.name,
-                        "content": text,
+                        "filename": name,
+                        "char_count": char_count,
                         "file_path": file_path,
                     }
                 )
-                document_names.append(uploaded_file.name)
-                logger.info(f"File '{uploaded_file.name}' uploaded and indexed.")
+                document_names.append(name)
+                logger.info(f"File '{name}' uploaded and indexed.")
 
         st.success("Files uploaded and indexed successfully!")
 
@@ -242,7 +251,7 @@ def render_upload_page() -> None:
                 col1, col2 = st.columns([4, 1])
                 with col1:
                     st.write(
-                        f"{idx}. {doc['filename']} - {len(doc['content'])} characters extracted"
+                        f"{idx}. {doc['filename']} - {doc['char_count']} characters extracted"
                     )
                 with col2:
                     delete_btn = st.button(
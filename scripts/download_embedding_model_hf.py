@@ -2,14 +2,47 @@
 Alternative: download all-mpnet-base-v2 using huggingface_hub (no SentenceTransformer load).
 Run: pip install huggingface_hub
 Then: python scripts/download_embedding_model_hf.py
+
+Optional: also export an int8-quantized ONNX copy to embedding_model/onnx-int8/ (faster CPU inference).
+Run: pip install "sentence-transformers[onnx]"
+Then: python scripts/download_embedding_model_hf.py --onnx-int8
 """
+import argparse
 from pathlib import Path
 
 REPO_ID = "sentence-transformers/all-mpnet-base-v2"
 SAVE_DIR = Path(__file__).resolve().parent.parent / "embedding_model"
+ONNX_INT8_DIR = SAVE_DIR / "onnx-int8"
+
+
+def export_onnx_int8() -> None:
+    """Export the downloaded model to ONNX and apply dynamic int8 (AVX512-VNNI) quantization."""
+    try:
+        from sentence_transformers import (
+            SentenceTransformer,
+            export_dynamic_quantized_onnx_model,
+        )
+    except ImportError:
+        print('Install the ONNX extras: pip install "sentence-transformers[onnx]"')
+        raise
+
+    print(f"Exporting ONNX model to {ONNX_INT8_DIR}...")
+    model = SentenceTransformer(str(SAVE_DIR), backend="onnx")
+    model.save(str(ONNX_INT8_DIR))
+    print("Quantizing to int8 (avx512_vnni)...")
+    export_dynamic_quantized_onnx_model(model, "avx512_vnni", str(ONNX_INT8_DIR))
+    print(f"Done. {ONNX_INT8_DIR} will be used automatically when EMBEDDING_MODEL_PATH = 'embedding_model'")
 
 
 def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--onnx-int8",
+        action="store_true",
+        help="also export an int8-quantized ONNX model to embedding_model/onnx-int8/",
+    )
+    args = parser.parse_args()
+
     try:
         from huggingface_hub import snapshot_download
     except ImportError:
@@ -21,6 +54,9 @@ def main() -> None:
     snapshot_download(repo_id=REPO_ID, local_dir=str(SAVE_DIR))
     print(f"Done. Set EMBEDDING_MODEL_PATH = 'embedding_model' in src/constants.py")
 
+    if args.onnx_int8:
+        export_onnx_int8()
+
 
 if __name__ == "__main__":
     main()
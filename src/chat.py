@@ -19,20 +19,24 @@ def get_rag_context(query: str, top_k: int = 5) -> str:
     Returns a string of concatenated chunk texts to use as context for the LLM, or empty string on failure.
     """
     try:
-        from src.constants import OPENSEARCH_INDEX
-        from src.embeddings import get_embedding_model
-        from src.opensearch import get_opensearch_client, hybrid_search
+        from opensearchpy.exceptions import NotFoundError
 
-        client = get_opensearch_client()
-        if not client.indices.exists(index=OPENSEARCH_INDEX):
-            return ""
-        model = get_embedding_model()
-        query_embedding = model.encode(query).tolist()
-        hits = hybrid_search(query_text=query, query_embedding=query_embedding, top_k=top_k)
-        if not hits:
+        from src.embeddings import get_query_embedding
+        from src.opensearch import hybrid_search
+
+        query_embedding = get_query_embedding(query)
+        try:
+            hits = hybrid_search(
+                query_text=query,
+                query_embedding=query_embedding,
+                top_k=top_k,
+                source_includes=["text"],
+            )
+        except NotFoundError:
+            # Index not created yet (no documents uploaded)
             return ""
-        parts = [hit["_source"]["text"].strip() for hit in hits if hit.get("_source", {}).get("text")]
-        return "\n\n".join(parts) if parts else ""
+        sources = (hit["_source"] for hit in hits)
+        return "\n\n".join(src["text"].strip() for src in sources if src.get("text"))
     except Exception as e:
         logger.warning(f"RAG retrieval failed: {e}")
         return ""
@@ -29,6 +29,12 @@ ASSYMETRIC_EMBEDDING = False
 #   - all-MiniLM-L12-v2  -> 384
 EMBEDDING_DIMENSION = int(os.environ.get("EMBEDDING_DIMENSION", "768"))
 
+# How many chunks are sent through the embedding model in one forward pass. Larger batches are faster but use more (GPU/CPU) memory; lower this if ingestion runs out of memory.
+EMBEDDING_BATCH_SIZE = int(os.environ.get("EMBEDDING_BATCH_SIZE", "64"))
+
+# How vectors are stored in the OpenSearch k-NN index: "float" (default) or "byte". With "byte", document and query embeddings are quantized to int8 (4x smaller index and search requests, small recall loss). Needs OpenSearch 2.17+ (faiss byte vectors); only applies to newly created indexes, so delete the index and re-upload documents after changing it.
+EMBEDDING_VECTOR_DATA_TYPE = os.environ.get("EMBEDDING_VECTOR_DATA_TYPE", "float").lower()
+
 # -----------------------------------------------------------------------------
 # Document chunking
 # -----------------------------------------------------------------------------
@@ -36,6 +42,9 @@ EMBEDDING_DIMENSION = int(os.environ.get("EMBEDDING_DIMENSION", "768"))
 # Maximum number of characters per text chunk when splitting documents. Smaller values (e.g. 300) often improve retrieval precision but create more chunks; larger values keep more context per chunk. Tune based on your documents and LLM context window.
 TEXT_CHUNK_SIZE = int(os.environ.get("TEXT_CHUNK_SIZE", "300"))
 
+# Maximum number of embedding-model tokens per chunk for the token-aware splitter used at upload. Must stay below the model's max sequence length (384 for all-mpnet-base-v2) or the end of each chunk is silently truncated.
+TEXT_CHUNK_TOKENS = int(os.environ.get("TEXT_CHUNK_TOKENS", "256"))
+
 # -----------------------------------------------------------------------------
 # LLM provider: ollama (local) | openai | gemini (prod)
 # -----------------------------------------------------------------------------
@@ -55,12 +64,35 @@ OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")
 GEMINI_API_KEY = os.environ.get("GEMINI_API_KEY", "")
 GEMINI_MODEL = os.environ.get("GEMINI_MODEL", "gemini-1.5-flash")
 
+# Approximate token budget for one LLM request (system prompt + chat history + RAG context + question). The oldest chat messages are dropped to stay under it; keeps prompts inside the model's context window and prefill fast. Tokens are estimated as characters / 4.
+MAX_INPUT_TOKENS = int(os.environ.get("MAX_INPUT_TOKENS", "6000"))
+
+# Response cache: identical requests (and, for first questions, near-identical ones) are answered from cache instead of calling the LLM.
+#   - memory: per-process dict (default)
+#   - sqlite: persisted in LLM_CACHE_PATH, survives restarts
+#   - off:    always call the LLM
+LLM_CACHE_BACKEND = os.environ.get("LLM_CACHE_BACKEND", "memory").lower().strip()
+LLM_CACHE_PATH = ".cache/llm_responses.sqlite3"
+
+# Minimum cosine similarity between two questions' embeddings for the semantic cache to reuse an answer. Raise it if you see answers to the wrong question.
+LLM_SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("LLM_SEMANTIC_CACHE_THRESHOLD", "0.85"))
+
 # -----------------------------------------------------------------------------
 # Logging (you can change the path if you prefer)
 # -----------------------------------------------------------------------------
 
 LOG_FILE_PATH = "logs/app.log"
 
+# -----------------------------------------------------------------------------
+# Local caches (safe to delete; rebuilt on demand)
+# -----------------------------------------------------------------------------
+
+# Extracted PDF text, one .txt file per PDF keyed by the SHA-256 of its bytes. Re-uploading an identical file skips PDF parsing.
+PDF_TEXT_CACHE_DIR = ".cache/pdf_text"
+
+# SQLite file of chunk embeddings keyed by a hash of (EMBEDDING_MODEL_PATH, chunk text). Repeated chunks (headers, footers, boilerplate, re-uploads) are embedded only once.
+EMBEDDING_CACHE_PATH = ".cache/embeddings.sqlite3"
+
 # -----------------------------------------------------------------------------
 # OpenSearch (vector store / search backend)
 # -----------------------------------------------------------------------------
@@ -69,6 +101,12 @@ LOG_FILE_PATH = "logs/app.log"
 OPENSEARCH_HOST = os.environ.get("OPENSEARCH_HOST", "localhost")
 OPENSEARCH_PORT = int(os.environ.get("OPENSEARCH_PORT", "9200"))
 
+# Max keep-alive connections the OpenSearch client keeps open (and so max concurrent requests without a new TCP handshake). Raise it if many users search at the same time.
+OPENSEARCH_POOL_MAXSIZE = int(os.environ.get("OPENSEARCH_POOL_MAXSIZE", "32"))
+
+# Default request timeout in seconds for OpenSearch calls (timed-out requests are retried up to 3 times). Bulk indexing and deletes set their own longer timeout.
+OPENSEARCH_TIMEOUT = int(os.environ.get("OPENSEARCH_TIMEOUT", "10"))
+
 # Name of the index where document chunks and embeddings are stored. The app will create this index if it does not exist. You usually do not need to change this unless you want to separate different projects.
 OPENSEARCH_INDEX = "documents"
 EMBEDDING_MODEL_PATH="embedding_model"
\ No newline at end of file
@@ -3,12 +3,22 @@ Load embedding model and generate embeddings for text chunks (for RAG indexing a
 """
 from __future__ import annotations
 
+import functools
+import hashlib
 import logging
-from typing import TYPE_CHECKING, Any, List
+import os
+import sqlite3
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
 
 import streamlit as st
 
-from src.constants import EMBEDDING_MODEL_PATH
+from src.constants import (
+    EMBEDDING_BATCH_SIZE,
+    EMBEDDING_CACHE_PATH,
+    EMBEDDING_DIMENSION,
+    EMBEDDING_MODEL_PATH,
+)
 from src.utils import setup_logging
 
 if TYPE_CHECKING:
@@ -18,34 +28,193 @@ if TYPE_CHECKING:
 setup_logging()
 logger = logging.getLogger(__name__)
 
+# Written by `python scripts/download_embedding_model_hf.py --onnx-int8` next to the local model.
+ONNX_INT8_DIR = Path(EMBEDDING_MODEL_PATH) / "onnx-int8"
+ONNX_INT8_FILE = "onnx/model_qint8_avx512_vnni.onnx"
+
+# Process-global model instance; checked before going through Streamlit's resource cache.
+_MODEL: Optional["SentenceTransformer"] = None
+
+
+def _cpu_supports_bf16() -> bool:
+    """
+    True if this CPU has native bfloat16 matmul instructions (AVX512-BF16 or AMX).
+    oneDNN also reports bf16 support on plain AVX512 CPUs by emulating it, which is slower
+    than FP32 there, so the instruction sets are checked directly.
+    """
+    import torch
+
+    try:
+        return bool(torch.cpu._is_avx512_bf16_supported() or torch.cpu._is_amx_tile_supported())
+    except (AttributeError, RuntimeError):
+        return False
+
 
-@st.cache_resource(show_spinner=False)
 def get_embedding_model() -> "SentenceTransformer":
+    """
+    Returns the process-wide embedding model, loading it on first use.
+    Hot path is a module-global lookup; st.cache_resource (in _load_embedding_model)
+    still keeps the model alive if Streamlit reloads this module.
+    """
+    global _MODEL
+    if _MODEL is None:
+        _MODEL = _load_embedding_model()
+    return _MODEL
+
+
+@st.cache_resource(show_spinner=False)
+def _load_embedding_model() -> "SentenceTransformer":
     """
     Loads and caches the embedding model.
     sentence_transformers (and its deps: transformers, sklearn, joblib) are imported
     here so they are not loaded at module import time, avoiding import-order and
     atexit issues when Streamlit reloads pages.
+
+    If an int8-quantized ONNX export exists (see ONNX_INT8_DIR) it is loaded with the
+    ONNX Runtime backend. Otherwise the PyTorch model runs in FP16 on a CUDA GPU,
+    in BF16 on CPUs with native bfloat16 support, and in FP32 everywhere else.
     """
+    import torch
     from sentence_transformers import SentenceTransformer
 
-    logger.info(f"Loading embedding model from path: {EMBEDDING_MODEL_PATH}")
-    return SentenceTransformer(EMBEDDING_MODEL_PATH)
+    if (ONNX_INT8_DIR / ONNX_INT8_FILE).exists():
+        logger.info(f"Loading int8 ONNX embedding model from path: {ONNX_INT8_DIR}")
+        return SentenceTransformer(
+            str(ONNX_INT8_DIR),
+            backend="onnx",
+            model_kwargs={"file_name": ONNX_INT8_FILE},
+        )
+
+    device = "cuda" if torch.cuda.is_available() else "cpu"
+    logger.info(f"Loading embedding model from path: {EMBEDDING_MODEL_PATH} (device={device})")
+    model = SentenceTransformer(EMBEDDING_MODEL_PATH, device=device)
+    if device == "cuda":
+        model.half()
+        logger.info("Embedding model converted to FP16.")
+    elif _cpu_supports_bf16():
+        model.to(torch.bfloat16)
+        logger.info("Embedding model converted to BF16.")
+    return model
+
+
+def _chunk_key(chunk: str) -> bytes:
+    """Cache key of a chunk: 16-byte BLAKE2b of the model path and the chunk text."""
+    return hashlib.blake2b(
+        f"{EMBEDDING_MODEL_PATH}\0{chunk}".encode("utf-8"), digest_size=16
+    ).digest()
+
+
+def _open_embedding_cache() -> sqlite3.Connection:
+    """Open (creating if needed) the on-disk embedding cache at EMBEDDING_CACHE_PATH."""
+    os.makedirs(os.path.dirname(EMBEDDING_CACHE_PATH) or ".", exist_ok=True)
+    conn = sqlite3.connect(EMBEDDING_CACHE_PATH)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, vector BLOB NOT NULL)"
+    )
+    return conn
 
 
-def generate_embeddings(chunks: List[str]) -> List[Any]:
+def _load_cached_embeddings(
+    conn: sqlite3.Connection, keys: Iterable[bytes]
+) -> Dict[bytes, "np.ndarray"]:
+    """Fetch cached float32 vectors for the given keys (missing keys are simply absent)."""
+    import numpy as np
+
+    keys = list(keys)
+    found: Dict[bytes, "np.ndarray"] = {}
+    for start in range(0, len(keys), 500):
+        batch = keys[start : start + 500]
+        placeholders = ",".join("?" * len(batch))
+        rows = conn.execute(
+            f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", batch
+        )
+        for key, vector in rows:
+            found[key] = np.frombuffer(vector, dtype=np.float32)
+    return found
+
+
+def generate_embeddings(chunks: List[str]) -> "np.ndarray":
     """
     Generates embeddings for a list of text chunks.
+    Duplicate chunks are embedded once, and chunks seen before (same text, same model) are
+    read from the on-disk cache at EMBEDDING_CACHE_PATH. The remaining chunks are encoded
+    in batches of EMBEDDING_BATCH_SIZE (one forward pass per batch). Embeddings are
+    L2-normalized, so the index's inner-product similarity equals cosine similarity.
 
     Args:
         chunks: List of text chunks.
 
     Returns:
-        List of embeddings (numpy arrays) for each chunk.
+        2D float32 numpy array of shape (len(chunks), EMBEDDING_DIMENSION); row i is the embedding of chunk i.
     """
-    import numpy as np  # Lazy import: only load when actually generating embeddings
-    
-    model = get_embedding_model()
-    embeddings = [np.array(model.encode(chunk)) for chunk in chunks]
-    logger.info(f"Generated embeddings for {len(chunks)} text chunks.")
+    import numpy as np
+
+    if not chunks:
+        return np.empty((0, EMBEDDING_DIMENSION), dtype=np.float32)
+
+    keys = [_chunk_key(chunk) for chunk in chunks]
+    conn: Optional[sqlite3.Connection] = None
+    try:
+        cache_conn = _open_embedding_cache()
+        conn = cache_conn
+        vectors = _load_cached_embeddings(cache_conn, set(keys))
+    except sqlite3.Error as e:
+        logger.warning(f"Embedding cache unavailable ({e}); encoding all chunks.")
+        if conn is not None:
+            conn.close()
+        conn, vectors = None, {}
+
+    # Unique chunks that still need a forward pass, in first-seen order
+    missing: Dict[bytes, str] = {}
+    for key, chunk in zip(keys, chunks):
+        if key not in vectors and key not in missing:
+            missing[key] = chunk
+
+    if missing:
+        model = get_embedding_model()
+        encoded = model.encode(
+            list(missing.values()),
+            batch_size=EMBEDDING_BATCH_SIZE,
+            convert_to_numpy=True,
+            show_progress_bar=False,
+            normalize_embeddings=True,
+            device=str(model.device),
+        ).astype(np.float32, copy=False)
+        vectors.update(zip(missing.keys(), encoded))
+
+    if conn is not None:
+        try:
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                    [(key, vectors[key].tobytes()) for key in missing],
+                )
+        except sqlite3.Error as e:
+            logger.warning(f"Could not write embedding cache: {e}")
+        finally:
+            conn.close()
+
+    embeddings = np.stack([vectors[key] for key in keys])
+    logger.info(
+        f"Generated embeddings for {len(chunks)} text chunks "
+        f"({len(missing)} encoded, {len(chunks) - len(missing)} duplicate or cached)."
+    )
     return embeddings
+
+
+@functools.lru_cache(maxsize=1024)
+def get_query_embedding(text: str) -> "np.ndarray":
+    """
+    Returns the normalized float32 embedding of a search query, computed once per distinct text.
+    The same vector serves the k-NN leg of hybrid search and the LLM semantic cache lookup.
+    The returned array is shared between callers and read-only.
+    """
+    import numpy as np
+
+    encoded = get_embedding_model().encode(text, normalize_embeddings=True)
+    embedding: "np.ndarray" = encoded.astype(np.float32, copy=False)
+    embedding.flags.writeable = False
+    return embedding
+
+
+__all__ = ["generate_embeddings", "get_embedding_model", "get_query_embedding"]
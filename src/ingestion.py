@@ -4,28 +4,34 @@ OpenSearch index creation, bulk indexing, and delete-by-document-name for RAG.
 import json
 import logging
 from pathlib import Path
-from typing import Any, Dict, List, Tuple
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Sequence, Tuple
 
 from opensearchpy import OpenSearch, helpers
 
 from src.constants import (
     ASSYMETRIC_EMBEDDING,
     EMBEDDING_DIMENSION,
+    EMBEDDING_VECTOR_DATA_TYPE,
     OPENSEARCH_INDEX,
 )
 from src.opensearch import get_opensearch_client
-from src.utils import setup_logging
+from src.utils import quantize_int8, setup_logging
+
+if TYPE_CHECKING:
+    import numpy as np
 
 setup_logging()
 logger = logging.getLogger(__name__)
 
 
 def load_index_config() -> Dict[str, Any]:
-    """Load index settings and mappings from src/index_config.json; set embedding dimension."""
+    """Load index settings and mappings from src/index_config.json; set embedding dimension and data type."""
     config_path = Path(__file__).resolve().parent / "index_config.json"
     with open(config_path, "r") as f:
         config = json.load(f)
     config["mappings"]["properties"]["embedding"]["dimension"] = EMBEDDING_DIMENSION
+    if EMBEDDING_VECTOR_DATA_TYPE == "byte":
+        config["mappings"]["properties"]["embedding"]["data_type"] = "byte"
     logger.info("Index configuration loaded from src/index_config.json.")
     return config
 
@@ -40,39 +46,56 @@ def create_index(client: OpenSearch) -> None:
         logger.info(f"Index {OPENSEARCH_INDEX} already exists.")
 
 
+def _bulk_actions(
+    embeddings: "np.ndarray", chunks: Sequence[str], document_name: str, char_count: int
+) -> Iterator[Dict[str, Any]]:
+    """Yield one bulk index action per chunk; embedding rows are passed through as ndarrays."""
+    for i, chunk in enumerate(chunks):
+        yield {
+            "_index": OPENSEARCH_INDEX,
+            "_id": f"{document_name}_{i}",
+            "_source": {
+                "text": f"passage: {chunk}" if ASSYMETRIC_EMBEDDING else chunk,
+                # Serialized directly by the client's OrjsonSerializer (no .tolist())
+                "embedding": embeddings[i],
+                "document_name": document_name,
+                "char_count": char_count,
+            },
+        }
+
+
 def bulk_index_documents(
-    documents: List[Dict[str, Any]],
+    embeddings: "np.ndarray",
+    chunks: Sequence[str],
+    document_name: str,
+    char_count: int = 0,
 ) -> Tuple[int, List[Any]]:
     """
-    Index documents into OpenSearch in bulk.
-    Each document must have: doc_id, text, embedding (array or ndarray), document_name.
+    Index the chunks of one document into OpenSearch in bulk.
+    Row i of embeddings (shape (len(chunks), EMBEDDING_DIMENSION)) is the embedding of chunks[i];
+    chunk i gets the id "<document_name>_<i>". char_count is the number of characters extracted
+    from the whole source document (shown on the upload page).
+    Actions are generated and sent in chunks as they are consumed, so the full request is
+    never held in memory.
     """
-    actions = []
     client = get_opensearch_client()
-
-    for doc in documents:
-        doc_id = doc["doc_id"]
-        emb = doc["embedding"]
-        embedding_list = emb.tolist() if hasattr(emb, "tolist") else list(emb)
-        document_name = doc["document_name"]
-        prefixed_text = (
-            f"passage: {doc['text']}" if ASSYMETRIC_EMBEDDING else doc["text"]
-        )
-        actions.append(
-            {
-                "_index": OPENSEARCH_INDEX,
-                "_id": doc_id,
-                "_source": {
-                    "text": prefixed_text,
-                    "embedding": embedding_list,
-                    "document_name": document_name,
-                },
-            }
-        )
-
-    success, errors = helpers.bulk(client, actions)
+    if EMBEDDING_VECTOR_DATA_TYPE == "byte":
+        # Embeddings are unit-normalized, so one fixed scale keeps documents comparable
+        embeddings = quantize_int8(embeddings, max_abs=1.0)
+    success, errors = 0, []
+    for ok, item in helpers.streaming_bulk(
+        client,
+        _bulk_actions(embeddings, chunks, document_name, char_count),
+        chunk_size=500,
+        max_chunk_bytes=10 * 1024 * 1024,
+        request_timeout=60,
+    ):
+        if ok:
+            success += 1
+        else:
+            errors.append(item)
     logger.info(
-        f"Bulk indexed {len(documents)} documents into {OPENSEARCH_INDEX} with {len(errors)} errors."
+        f"Bulk indexed {success} chunks of '{document_name}' into {OPENSEARCH_INDEX} with {len(errors)} errors."
     )
     return success, errors
 
@@ -81,6 +104,6 @@ def delete_documents_by_document_name(document_name: str) -> Dict[str, Any]:
     """Delete all documents in the index whose document_name matches."""
     client = get_opensearch_client()
     query = {"query": {"term": {"document_name": document_name}}}
-    response = client.delete_by_query(index=OPENSEARCH_INDEX, body=query)
+    response = client.delete_by_query(index=OPENSEARCH_INDEX, body=query, request_timeout=60)
     logger.info(f"Deleted documents with name '{document_name}' from {OPENSEARCH_INDEX}.")
     return response
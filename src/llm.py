@@ -2,130 +2,642 @@
 LLM abstraction: Ollama (local), OpenAI, or Gemini.
 Switch via env LLM_PROVIDER=ollama|openai|gemini. All backends expose the same streaming interface.
 """
+import functools
+import hashlib
 import logging
-from typing import Any, Dict, Iterator, List, Optional
+import re
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
 
 from src.constants import (
     GEMINI_API_KEY,
     GEMINI_MODEL,
     LLM_PROVIDER,
+    MAX_INPUT_TOKENS,
     OLLAMA_HOST,
     OLLAMA_MODEL_NAME,
     OPENAI_API_KEY,
     OPENAI_MODEL,
 )
-from src.utils import setup_logging
+from src.llm_cache import cache_key, create_response_cache
+from src.utils import CircuitBreaker, EmbeddingVector, loop_local
 
-setup_logging()
 logger = logging.getLogger(__name__)
 
+_response_cache = create_response_cache()
 
-def _build_messages(chat_history: List[Dict[str, str]], new_prompt: str) -> List[Dict[str, str]]:
-    """Build messages list for API: last N turns + new user message."""
-    messages: List[Dict[str, str]] = []
-    max_turns = 10
-    for msg in chat_history[-max_turns * 2 :]:
+# Ollama readiness: model name -> time.monotonic() of the last successful check
+_READY_TTL_SECONDS = 60
+_ready_cache: Dict[str, float] = {}
+
+# One breaker per provider: during an outage requests fail immediately instead of each waiting
+# for the SDK timeout (see CircuitBreaker)
+_breakers: Dict[str, CircuitBreaker] = {
+    provider: CircuitBreaker(provider) for provider in ("ollama", "openai", "gemini")
+}
+
+# Sent first on every request. Keep it byte-identical: providers cache the KV state of a stable
+# prompt prefix (system prompt + earlier turns), which cuts prefill time on long conversations.
+STATIC_SYSTEM_PROMPT = (
+    "You are a helpful assistant. When context from the user's uploaded documents is provided, "
+    "use it to answer the question. If the context does not contain relevant information, say so."
+)
+
+
+def _model_name() -> str:
+    """Model used by the configured LLM_PROVIDER."""
+    if LLM_PROVIDER == "openai":
+        return OPENAI_MODEL
+    if LLM_PROVIDER == "gemini":
+        return GEMINI_MODEL
+    return OLLAMA_MODEL_NAME
+
+
+@functools.lru_cache(maxsize=1)
+def _get_ollama() -> Any:
+    """Process-wide Ollama client (reuses its HTTP connection pool across requests)."""
+    import ollama
+
+    # Point client at OLLAMA_HOST (e.g. http://ollama:11434 in Docker)
+    return ollama.Client(host=OLLAMA_HOST)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_ollama_probe() -> Any:
+    """Ollama client with a 3s timeout for health/model checks (chat streams need no such limit)."""
+    import ollama
+
+    return ollama.Client(host=OLLAMA_HOST, timeout=3)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_openai() -> Any:
+    """Process-wide OpenAI client (reuses its HTTP connection pool and TLS sessions)."""
+    from openai import OpenAI
+
+    return OpenAI(api_key=OPENAI_API_KEY)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_gemini_model() -> Any:
+    """Process-wide Gemini model with the static system prompt as its system instruction; genai.configure runs once."""
+    import google.generativeai as genai
+
+    genai.configure(api_key=GEMINI_API_KEY)
+    return genai.GenerativeModel(GEMINI_MODEL, system_instruction=STATIC_SYSTEM_PROMPT)
+
+
+def _new_async_ollama() -> Any:
+    import ollama
+
+    return ollama.AsyncClient(host=OLLAMA_HOST)
+
+
+def _new_async_openai() -> Any:
+    from openai import AsyncOpenAI
+
+    return AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+
+async def _aclose_async_ollama(client: Any) -> None:
+    # ollama.AsyncClient (0.3) has no close(); close its httpx client
+    await client._client.aclose()
+
+
+def _get_async_ollama() -> Any:
+    """Ollama AsyncClient of the running event loop, created on first use in that loop."""
+    return loop_local("ollama", _new_async_ollama, _aclose_async_ollama)
+
+
+def _get_async_openai() -> Any:
+    """AsyncOpenAI client of the running event loop, created on first use in that loop."""
+    return loop_local("openai", _new_async_openai)
+
+
+def _token_estimate(text: str) -> int:
+    """Cheap token count estimate (~4 characters per token for English text)."""
+    return max(1, len(text) // 4)
+
+
+def _build_messages(
+    chat_history: List[Dict[str, str]], new_prompt: str, context: Optional[str] = None
+) -> List[Dict[str, str]]:
+    """
+    Build messages list for API, stable prefix first:
+    static system prompt + the most recent history that fits in MAX_INPUT_TOKENS (after
+    reserving room for the prompt and context), then the volatile RAG context and the new
+    user message. Older messages are dropped from the front, so the kept prefix stays stable.
+    """
+    context_message = f"Context from the uploaded documents:\n{context}" if context else ""
+    budget = MAX_INPUT_TOKENS - sum(
+        _token_estimate(s) for s in (STATIC_SYSTEM_PROMPT, context_message, new_prompt)
+    )
+    start = len(chat_history)
+    while start > 0:
+        cost = _token_estimate(chat_history[start - 1]["content"])
+        if cost > budget:
+            break
+        budget -= cost
+        start -= 1
+
+    messages: List[Dict[str, str]] = [{"role": "system", "content": STATIC_SYSTEM_PROMPT}]
+    for msg in chat_history[start:]:
         messages.append({"role": msg["role"], "content": msg["content"]})
+    if context_message:
+        messages.append({"role": "system", "content": context_message})
     messages.append({"role": "user", "content": new_prompt})
     return messages
 
 
-def _stream_ollama(prompt: str, chat_history: List[Dict[str, str]], temperature: float) -> Optional[Iterator[Any]]:
-    """Stream from Ollama. Yields chunks with ['message']['content']."""
-    import ollama
+def _ollama_text(stream: Iterator[Any]) -> Iterator[str]:
+    """Unwrap Ollama stream chunks to their non-empty ['message']['content'] text."""
+    try:
+        for chunk in stream:
+            text = chunk["message"]["content"]
+            if text:
+                yield text
+    except Exception as e:
+        logger.error(f"Ollama stream error: {e}")
+        raise
+
 
-    messages = _build_messages(chat_history, prompt)
+def _stream_ollama(messages: List[Dict[str, str]], temperature: float) -> Optional[Iterator[str]]:
+    """Stream from Ollama. Yields text chunks."""
     try:
-        # Point client at OLLAMA_HOST (e.g. http://ollama:11434 in Docker)
-        client = ollama.Client(host=OLLAMA_HOST)
-        stream = client.chat(
+        stream = _get_ollama().chat(
             model=OLLAMA_MODEL_NAME,
             messages=messages,
             stream=True,
             options={"temperature": temperature},
         )
-        return stream
+        return _ollama_text(stream)
     except Exception as e:
         logger.error(f"Ollama stream error: {e}")
         return None
 
 
-def _stream_openai(prompt: str, chat_history: List[Dict[str, str]], temperature: float) -> Optional[Iterator[Any]]:
-    """Stream from OpenAI. Yields chunks compatible with same shape as Ollama for the UI."""
+def _stream_openai(messages: List[Dict[str, str]], temperature: float) -> Iterator[str]:
+    """Stream from OpenAI. Yields text chunks."""
     if not OPENAI_API_KEY:
         logger.error("OPENAI_API_KEY not set")
-        return None
+        return
     try:
-        from openai import OpenAI
-
-        client = OpenAI(api_key=OPENAI_API_KEY)
-        messages = _build_messages(chat_history, prompt)
-        # OpenAI wants {"role": "user", "content": "..."} and optionally system
-        api_messages = [{"role": m["role"], "content": m["content"]} for m in messages]
-        stream = client.chat.completions.create(
+        # _build_messages already produces OpenAI's {"role": ..., "content": ...} shape
+        stream = _get_openai().chat.completions.create(
             model=OPENAI_MODEL,
-            messages=api_messages,
+            messages=messages,
             stream=True,
             temperature=temperature,
         )
-        # Normalize to same shape as Ollama: yield {"message": {"content": delta}}
         for chunk in stream:
-            delta = chunk.choices[0].delta if chunk.choices else None
-            if delta and getattr(delta, "content", None):
-                yield {"message": {"content": delta.content}}
+            try:
+                text = chunk.choices[0].delta.content
+            except (AttributeError, IndexError):
+                continue
+            if text:
+                yield text
     except Exception as e:
         logger.error(f"OpenAI stream error: {e}")
-        return None
+        raise
+
+
+def _gemini_chat(messages: List[Dict[str, str]]) -> Tuple[List[Dict[str, Any]], str]:
+    """
+    Convert messages to Gemini chat history (role "user" / "model") plus the message to send.
+    The static system prompt is the model's system_instruction; other system messages
+    (RAG context) are prepended to the user message that follows them. Messages with empty
+    content (e.g. an interrupted reply) are skipped, since Gemini rejects empty text parts,
+    and the turns around them are merged.
+    """
+    history: List[Dict[str, Any]] = []
+    pending_system: List[str] = []
+    for m in messages:
+        if m["role"] == "system":
+            if m["content"] != STATIC_SYSTEM_PROMPT:
+                pending_system.append(m["content"])
+            continue
+        if not m["content"].strip() and m is not messages[-1]:
+            continue
+        text = "\n\n".join(pending_system + [m["content"]])
+        pending_system = []
+        role = "model" if m["role"] == "assistant" else "user"
+        if history and history[-1]["role"] == role and m is not messages[-1]:
+            # A skipped empty reply leaves two user turns in a row; keep turns alternating
+            history[-1]["parts"].append(text)
+        else:
+            history.append({"role": role, "parts": [text]})
+    message = history.pop()["parts"][0]
+    if history and history[-1]["role"] == "user":
+        message = "\n\n".join(history.pop()["parts"] + [message])
+    # Gemini expects the history to open with a user turn; truncation may have cut it
+    while history and history[0]["role"] == "model":
+        history.pop(0)
+    return history, message
 
 
-def _stream_gemini(prompt: str, chat_history: List[Dict[str, str]], temperature: float) -> Optional[Iterator[Any]]:
-    """Stream from Google Gemini. Yields chunks with ['message']['content'] for UI."""
+def _stream_gemini(messages: List[Dict[str, str]], temperature: float) -> Iterator[str]:
+    """Stream from Google Gemini. Yields text chunks."""
     if not GEMINI_API_KEY:
         logger.error("GEMINI_API_KEY not set")
-        return None
+        return
     try:
-        import google.generativeai as genai
-
-        genai.configure(api_key=GEMINI_API_KEY)
-        model = genai.GenerativeModel(GEMINI_MODEL)
-        # Build a single prompt with conversation history for context
-        messages = _build_messages(chat_history, prompt)
-        prompt_with_history = "\n".join(
-            f"{m['role'].capitalize()}: {m['content']}" for m in messages
+        history, message = _gemini_chat(messages)
+        chat = _get_gemini_model().start_chat(history=history)
+        response = chat.send_message(
+            message, stream=True, generation_config={"temperature": temperature}
         )
-        response = model.generate_content(prompt_with_history, stream=True)
         for chunk in response:
-            if chunk.text:
-                yield {"message": {"content": chunk.text}}
+            # chunk.text is a property that re-joins the candidate's parts; read it once
+            text = chunk.text
+            if text:
+                yield text
     except Exception as e:
         logger.error(f"Gemini stream error: {e}")
+        raise
+
+
+# Runs of tiny stream chunks (single tokens, punctuation) are merged before reaching the UI:
+# chunks shorter than _COALESCE_MIN_CHARS are buffered until the buffer holds
+# _COALESCE_TARGET_CHARS characters, a newline arrives, or _COALESCE_MAX_DELAY_SECONDS passed.
+_COALESCE_MIN_CHARS = 4
+_COALESCE_TARGET_CHARS = 16
+_COALESCE_MAX_DELAY_SECONDS = 0.02
+
+
+class _ChunkCoalescer:
+    """Buffers tiny stream chunks; push() returns text to emit (or None), flush() returns the rest."""
+
+    def __init__(self) -> None:
+        self._parts: List[str] = []
+        self._size = 0
+        self._started = 0.0
+
+    def push(self, text: str) -> Optional[str]:
+        if not self._parts and len(text) >= _COALESCE_MIN_CHARS:
+            return text
+        if not self._parts:
+            self._started = time.monotonic()
+        self._parts.append(text)
+        self._size += len(text)
+        if (
+            len(text) >= _COALESCE_MIN_CHARS
+            or self._size >= _COALESCE_TARGET_CHARS
+            or "\n" in text
+            or time.monotonic() - self._started >= _COALESCE_MAX_DELAY_SECONDS
+        ):
+            return self.flush()
         return None
 
+    def flush(self) -> str:
+        text = "".join(self._parts)
+        self._parts = []
+        self._size = 0
+        return text
+
+
+def _coalesce(stream: Iterator[str]) -> Iterator[str]:
+    """
+    Merge adjacent tiny chunks of a provider stream (see _ChunkCoalescer). The delay bound is
+    checked when the next chunk arrives; buffered text is always flushed at the end, also
+    before a provider error is re-raised.
+    Whitespace-only chunks are kept: they carry the spaces and newlines of the markdown.
+    """
+    coalescer = _ChunkCoalescer()
+    try:
+        for text in stream:
+            out = coalescer.push(text)
+            if out:
+                yield out
+    except Exception:
+        rest = coalescer.flush()
+        if rest:
+            yield rest
+        raise
+    rest = coalescer.flush()
+    if rest:
+        yield rest
+
+
+def _replay(response: str) -> Iterator[str]:
+    """Yield a cached response word by word (whitespace kept) so it streams like a live one."""
+    for piece in re.split(r"(?<=\s)(?=\S)", response):
+        if piece:
+            yield piece
+
+
+def _breaker() -> CircuitBreaker:
+    """Circuit breaker of the configured LLM_PROVIDER."""
+    return _breakers.get(LLM_PROVIDER, _breakers["ollama"])
+
+
+def _record_outcome(stream: Iterator[str], breaker: CircuitBreaker) -> Iterator[str]:
+    """Pass a provider stream through, recording on breaker whether it failed or completed."""
+    try:
+        yield from stream
+    except Exception:
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+
+
+def _cache_when_complete(
+    stream: Iterator[str],
+    key: str,
+    namespace: str,
+    query_embedding: Optional[EmbeddingVector],
+) -> Iterator[str]:
+    """
+    Pass a provider stream through, caching the full response once it ends normally.
+    Provider errors (already logged by the provider) propagate to the caller after the text
+    received so far; nothing is cached for a failed stream.
+    """
+    parts: List[str] = []
+    for text in stream:
+        parts.append(text)
+        yield text
+    if parts and _response_cache is not None:
+        _response_cache.set(key, namespace, "".join(parts), query_embedding)
+
+
+def _prepare_request(
+    prompt: str,
+    chat_history: Optional[List[Dict[str, str]]],
+    temperature: float,
+    context: Optional[str],
+    query_embedding: Optional[EmbeddingVector],
+) -> Tuple[List[Dict[str, str]], str, str, Optional[EmbeddingVector]]:
+    """Build the messages plus cache key, cache namespace and semantic-cache embedding for a request."""
+    chat_history = chat_history or []
+    context = context.strip() if context else None
+    messages = _build_messages(chat_history, prompt, context)
+    key = cache_key(LLM_PROVIDER, _model_name(), temperature, messages)
+    # Semantic matches are only reused when retrieval returned the same context (same chunks)
+    context_hash = hashlib.sha256((context or "").encode("utf-8")).hexdigest()
+    namespace = f"{LLM_PROVIDER}|{_model_name()}|{temperature}|{context_hash}"
+    # Follow-up questions depend on the conversation, so only first questions use the semantic tier
+    semantic_embedding = query_embedding if not chat_history else None
+    return messages, key, namespace, semantic_embedding
+
 
 def generate_response_streaming(
     prompt: str,
     chat_history: Optional[List[Dict[str, str]]] = None,
     temperature: float = 0.7,
     context: Optional[str] = None,
-) -> Optional[Iterator[Any]]:
+    query_embedding: Optional[EmbeddingVector] = None,
+) -> Optional[Iterator[str]]:
     """
     Stream LLM response. Backend is chosen by LLM_PROVIDER (ollama | openai | gemini).
-    All backends yield chunks with chunk["message"]["content"] for the UI.
-    If context is provided (from RAG), it is prepended to the user prompt so the LLM answers using your documents.
+    All backends yield non-empty text chunks (str), so callers need no per-chunk unwrapping;
+    runs of tiny chunks are merged first (see _coalesce) so the UI redraws less often.
+    If context is provided (from RAG), it is sent as a system message right before the question
+    (after the cache-stable system prompt and history) so the LLM answers using your documents.
+
+    Responses are cached (see src/llm_cache.py and LLM_CACHE_BACKEND): an identical request is
+    replayed from cache. If query_embedding (embedding of the raw question) is given and there
+    is no chat history, a cached answer to a semantically similar first question is reused too.
+
+    Returns None if the request could not be started, or right away while the provider's
+    circuit breaker is open after repeated failures.
     """
-    chat_history = chat_history or []
-    if context and context.strip():
-        prompt = (
-            "Use the following context from the uploaded documents to answer the question. "
-            "If the context does not contain relevant information, say so.\n\n"
-            f"Context:\n{context.strip()}\n\n"
-            f"Question: {prompt}"
+    messages, key, namespace, semantic_embedding = _prepare_request(
+        prompt, chat_history, temperature, context, query_embedding
+    )
+    if _response_cache is not None:
+        cached = _response_cache.get(key, namespace, semantic_embedding)
+        if cached is not None:
+            return _replay(cached)
+
+    breaker = _breaker()
+    if not breaker.allow():
+        logger.warning(f"LLM provider '{LLM_PROVIDER}' circuit is open; failing fast.")
+        return None
+    if LLM_PROVIDER == "openai":
+        stream: Optional[Iterator[str]] = _stream_openai(messages, temperature)
+    elif LLM_PROVIDER == "gemini":
+        stream = _stream_gemini(messages, temperature)
+    else:
+        stream = _stream_ollama(messages, temperature)
+    if stream is None:
+        breaker.record_failure()
+        return None
+    stream = _record_outcome(stream, breaker)
+    return _cache_when_complete(_coalesce(stream), key, namespace, semantic_embedding)
+
+
+def _complete(prompt: str, temperature: float, context: Optional[str] = None) -> str:
+    """Run one prompt through generate_response_streaming and return the whole answer ("" on failure)."""
+    stream = generate_response_streaming(prompt, temperature=temperature, context=context)
+    if stream is None:
+        return ""
+    try:
+        return "".join(stream)
+    except Exception:
+        # Already logged by the provider; a partial answer is not returned as if complete
+        return ""
+
+
+def _parse_batched_answers(text: str, count: int) -> Optional[List[str]]:
+    """Split a '[i] answer' response into count answers; None unless every index 1..count is present."""
+    pieces = re.split(r"^\[(\d+)\]\s*", text, flags=re.MULTILINE)
+    answers = {int(index): answer.strip() for index, answer in zip(pieces[1::2], pieces[2::2])}
+    if sorted(answers) != list(range(1, count + 1)):
+        return None
+    return [answers[i] for i in range(1, count + 1)]
+
+
+def generate_responses_batched(
+    prompts: List[str],
+    contexts: Optional[List[str]] = None,
+    batch_size: int = 8,
+    temperature: float = 0.7,
+) -> List[str]:
+    """
+    Answer many independent questions (RAG eval, bulk summaries, classification) with one LLM
+    call per batch_size questions instead of one per question: the system prompt and request
+    round trip are paid once per batch. contexts[i], if given, is the RAG context for prompts[i].
+    Each batch asks for '[i] <answer>' lines; if the reply cannot be parsed, that batch falls
+    back to one call per question. Returns one answer per prompt, in order.
+    Raises ValueError if contexts is given with a different length than prompts, or if
+    batch_size is less than 1.
+    """
+    if batch_size < 1:
+        raise ValueError(f"batch_size must be at least 1, got {batch_size}")
+    if contexts is None:
+        contexts = [""] * len(prompts)
+    elif len(contexts) != len(prompts):
+        raise ValueError(
+            f"Got {len(contexts)} contexts for {len(prompts)} prompts; pass one context per prompt."
+        )
+    answers: List[str] = []
+    for start in range(0, len(prompts), batch_size):
+        batch = list(zip(prompts[start : start + batch_size], contexts[start : start + batch_size]))
+        lines = [
+            "Answer each question. Respond in the format '[i] <answer>' on separate lines, "
+            "one entry per question, using the question's number as i."
+        ]
+        for i, (question, context) in enumerate(batch, 1):
+            lines.append(f"[{i}] {question}")
+            if context and context.strip():
+                lines.append(f"Context for [{i}]:\n{context.strip()}")
+        parsed = _parse_batched_answers(_complete("\n".join(lines), temperature), len(batch))
+        if parsed is None:
+            logger.warning(
+                f"Could not parse batched answers for prompts {start}-{start + len(batch) - 1}; "
+                "falling back to one request per prompt."
+            )
+            parsed = [_complete(question, temperature, context or None) for question, context in batch]
+        answers.extend(parsed)
+    return answers
+
+
+async def _astream_ollama(messages: List[Dict[str, str]], temperature: float) -> AsyncIterator[str]:
+    """Async stream from Ollama. Yields text chunks."""
+    try:
+        stream = await _get_async_ollama().chat(
+            model=OLLAMA_MODEL_NAME,
+            messages=messages,
+            stream=True,
+            options={"temperature": temperature},
+        )
+        async for chunk in stream:
+            text = chunk["message"]["content"]
+            if text:
+                yield text
+    except Exception as e:
+        logger.error(f"Ollama stream error: {e}")
+        raise
+
+
+async def _astream_openai(messages: List[Dict[str, str]], temperature: float) -> AsyncIterator[str]:
+    """Async stream from OpenAI. Yields text chunks."""
+    if not OPENAI_API_KEY:
+        logger.error("OPENAI_API_KEY not set")
+        return
+    try:
+        stream = await _get_async_openai().chat.completions.create(
+            model=OPENAI_MODEL,
+            messages=messages,
+            stream=True,
+            temperature=temperature,
+        )
+        async for chunk in stream:
+            try:
+                text = chunk.choices[0].delta.content
+            except (AttributeError, IndexError):
+                continue
+            if text:
+                yield text
+    except Exception as e:
+        logger.error(f"OpenAI stream error: {e}")
+        raise
+
+
+async def _astream_gemini(messages: List[Dict[str, str]], temperature: float) -> AsyncIterator[str]:
+    """Async stream from Google Gemini. Yields text chunks."""
+    if not GEMINI_API_KEY:
+        logger.error("GEMINI_API_KEY not set")
+        return
+    try:
+        history, message = _gemini_chat(messages)
+        chat = _get_gemini_model().start_chat(history=history)
+        response = await chat.send_message_async(
+            message, stream=True, generation_config={"temperature": temperature}
         )
+        async for chunk in response:
+            # chunk.text is a property that re-joins the candidate's parts; read it once
+            text = chunk.text
+            if text:
+                yield text
+    except Exception as e:
+        logger.error(f"Gemini stream error: {e}")
+        raise
+
+
+async def agenerate_response_streaming(
+    prompt: str,
+    chat_history: Optional[List[Dict[str, str]]] = None,
+    temperature: float = 0.7,
+    context: Optional[str] = None,
+    query_embedding: Optional[EmbeddingVector] = None,
+) -> AsyncIterator[str]:
+    """
+    Async version of generate_response_streaming (same messages, caching and text chunks).
+    Network waits yield to the event loop, so many sessions can stream concurrently on one loop
+    (e.g. FastAPI). Provider errors are logged and re-raised after the text received so far.
+    The provider client is kept per event loop; await src.utils.aclose_loop_locals() before
+    the loop ends to close it.
+    """
+    messages, key, namespace, semantic_embedding = _prepare_request(
+        prompt, chat_history, temperature, context, query_embedding
+    )
+    if _response_cache is not None:
+        cached = _response_cache.get(key, namespace, semantic_embedding)
+        if cached is not None:
+            for piece in _replay(cached):
+                yield piece
+            return
+
+    breaker = _breaker()
+    if not breaker.allow():
+        logger.warning(f"LLM provider '{LLM_PROVIDER}' circuit is open; failing fast.")
+        return
     if LLM_PROVIDER == "openai":
-        return _stream_openai(prompt, chat_history, temperature)
-    if LLM_PROVIDER == "gemini":
-        return _stream_gemini(prompt, chat_history, temperature)
-    return _stream_ollama(prompt, chat_history, temperature)
+        stream = _astream_openai(messages, temperature)
+    elif LLM_PROVIDER == "gemini":
+        stream = _astream_gemini(messages, temperature)
+    else:
+        stream = _astream_ollama(messages, temperature)
+    parts: List[str] = []
+    coalescer = _ChunkCoalescer()
+    try:
+        async for text in stream:
+            out = coalescer.push(text)
+            if out:
+                parts.append(out)
+                yield out
+    except Exception:
+        breaker.record_failure()
+        rest = coalescer.flush()
+        if rest:
+            yield rest
+        raise
+    breaker.record_success()
+    rest = coalescer.flush()
+    if rest:
+        parts.append(rest)
+        yield rest
+    if parts and _response_cache is not None:
+        _response_cache.set(key, namespace, "".join(parts), semantic_embedding)
+
+
+def _ollama_ready(model_name: str) -> bool:
+    """
+    True if the Ollama server answers and has model_name (pulling it if missing).
+    One client.list() call is both the health check and the model lookup; a positive result
+    is reused for _READY_TTL_SECONDS by every caller in the process.
+    """
+    verified_at = _ready_cache.get(model_name)
+    if verified_at is not None and time.monotonic() - verified_at < _READY_TTL_SECONDS:
+        return True
+
+    import httpx
+    import ollama
+
+    try:
+        resp = _get_ollama_probe().list()
+    except (httpx.HTTPError, ollama.ResponseError) as e:
+        logger.warning(f"Ollama server at {OLLAMA_HOST} is not reachable: {e}. Is Ollama running?")
+        return False
+    names = [m.get("model") or m.get("name") for m in resp["models"]]
+    if model_name not in names:
+        logger.info(f"Pulling model {model_name}...")
+        _get_ollama().pull(model_name)
+        # Re-verify with list() on the next check rather than trusting the pull
+        _ready_cache.pop(model_name, None)
+        return True
+    _ready_cache[model_name] = time.monotonic()
+    return True
 
 
 def ensure_model_pulled(model_name: str) -> bool:
@@ -134,36 +646,9 @@ def ensure_model_pulled(model_name: str) -> bool:
         return bool(OPENAI_API_KEY)
     if LLM_PROVIDER == "gemini":
         return bool(GEMINI_API_KEY)
-    
-    # For Ollama: check if server is reachable with timeout, then check/pull model
+
     try:
-        import ollama
-        import requests
-        
-        # Quick health check: try to reach Ollama with a short timeout (3 seconds)
-        try:
-            health_url = OLLAMA_HOST.rstrip("/") + "/api/tags"
-            response = requests.get(health_url, timeout=3)
-            if response.status_code != 200:
-                logger.warning(f"Ollama server at {OLLAMA_HOST} returned status {response.status_code}. Is Ollama running?")
-                return False
-        except requests.exceptions.RequestException as e:
-            logger.warning(f"Ollama server at {OLLAMA_HOST} is not reachable: {e}. Is Ollama running?")
-            return False
-        
-        # If reachable, check/pull model
-        client = ollama.Client(host=OLLAMA_HOST)
-        resp = client.list()
-        if isinstance(resp, dict):
-            models = resp.get("models", [])
-            names = [m.get("name", m.get("model", "")) for m in models]
-        else:
-            models = getattr(resp, "models", [])
-            names = [getattr(m, "model", getattr(m, "name", "")) for m in models]
-        if model_name not in names:
-            logger.info(f"Pulling model {model_name}...")
-            client.pull(model_name)
-        return True
+        return _ollama_ready(model_name)
     except Exception as e:
         logger.warning(f"Could not check/pull Ollama model ({e}). Is Ollama running at {OLLAMA_HOST}?")
         return False
@@ -0,0 +1,176 @@
+"""
+LLM response cache: exact-match (in-memory dict or SQLite) plus a semantic tier that matches
+new questions to cached ones by cosine similarity of their query embeddings.
+Used by src/llm.py to answer repeated questions without calling the LLM.
+"""
+import collections
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import TYPE_CHECKING, Dict, List, Optional, Protocol
+
+from src.constants import (
+    LLM_CACHE_BACKEND,
+    LLM_CACHE_PATH,
+    LLM_SEMANTIC_CACHE_THRESHOLD,
+)
+from src.utils import EmbeddingVector
+
+if TYPE_CHECKING:
+    import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(
+    provider: str, model: str, temperature: float, messages: List[Dict[str, str]]
+) -> str:
+    """Exact-match key: SHA-256 of provider, model, temperature and the full message list."""
+    payload = f"{provider}|{model}|{temperature}|{json.dumps(messages, sort_keys=True)}"
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ExactCache(Protocol):
+    """Exact-match tier interface implemented by InMemoryCache and SQLiteCache."""
+
+    def get(self, key: str) -> Optional[str]: ...
+
+    def set(self, key: str, response: str) -> None: ...
+
+
+class InMemoryCache:
+    """Exact-match LRU cache in a process-local dict; keeps at most max_entries answers."""
+
+    def __init__(self, max_entries: int = 1024) -> None:
+        self.max_entries = max_entries
+        self._data: "collections.OrderedDict[str, str]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            response = self._data.get(key)
+            if response is not None:
+                self._data.move_to_end(key)
+            return response
+
+    def set(self, key: str, response: str) -> None:
+        with self._lock:
+            self._data[key] = response
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+
+class SQLiteCache:
+    """Exact-match cache persisted in a SQLite table cache(key TEXT PRIMARY KEY, response TEXT)."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with sqlite3.connect(path) as conn:
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, response TEXT)"
+            )
+
+    def get(self, key: str) -> Optional[str]:
+        with sqlite3.connect(self._path) as conn:
+            row = conn.execute("SELECT response FROM cache WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def set(self, key: str, response: str) -> None:
+        with sqlite3.connect(self._path) as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, response) VALUES (?, ?)", (key, response)
+            )
+
+
+class SemanticCache:
+    """
+    In-memory nearest-neighbour cache: a matrix of query embeddings and their answers.
+    A lookup hits when the best cosine similarity within the same namespace reaches threshold.
+    Keeps at most max_entries answers, dropping the oldest first.
+    """
+
+    def __init__(self, threshold: float, max_entries: int = 1024) -> None:
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._embeddings: Optional["np.ndarray"] = None
+        self._namespaces: List[str] = []
+        self._responses: List[str] = []
+        self._lock = threading.Lock()
+
+    def get(self, namespace: str, query_embedding: EmbeddingVector) -> Optional[str]:
+        import numpy as np
+
+        with self._lock:
+            if self._embeddings is None:
+                return None
+            q = np.asarray(query_embedding, dtype=np.float32)
+            norms = np.linalg.norm(self._embeddings, axis=1)
+            similarities = self._embeddings @ q / (norms * np.linalg.norm(q) + 1e-12)
+            for i in np.argsort(similarities)[::-1]:
+                if similarities[i] < self.threshold:
+                    return None
+                if self._namespaces[int(i)] == namespace:
+                    return self._responses[int(i)]
+            return None
+
+    def set(self, namespace: str, query_embedding: EmbeddingVector, response: str) -> None:
+        import numpy as np
+
+        row = np.asarray(query_embedding, dtype=np.float32)[None, :]
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = row
+            else:
+                self._embeddings = np.vstack([self._embeddings, row])[-self.max_entries :]
+            self._namespaces = (self._namespaces + [namespace])[-self.max_entries :]
+            self._responses = (self._responses + [response])[-self.max_entries :]
+
+
+class LLMResponseCache:
+    """Two-tier response cache: exact match on the request, then semantic match on the question."""
+
+    def __init__(self, exact: ExactCache, semantic: Optional[SemanticCache] = None) -> None:
+        self.exact = exact
+        self.semantic = semantic
+
+    def get(
+        self,
+        key: str,
+        namespace: str,
+        query_embedding: Optional[EmbeddingVector] = None,
+    ) -> Optional[str]:
+        response = self.exact.get(key)
+        if response is None and self.semantic is not None and query_embedding is not None:
+            response = self.semantic.get(namespace, query_embedding)
+            if response is not None:
+                logger.info("LLM response served from semantic cache.")
+        elif response is not None:
+            logger.info("LLM response served from exact-match cache.")
+        return response
+
+    def set(
+        self,
+        key: str,
+        namespace: str,
+        response: str,
+        query_embedding: Optional[EmbeddingVector] = None,
+    ) -> None:
+        self.exact.set(key, response)
+        if self.semantic is not None and query_embedding is not None:
+            self.semantic.set(namespace, query_embedding, response)
+
+
+def create_response_cache() -> Optional[LLMResponseCache]:
+    """Build the cache selected by LLM_CACHE_BACKEND (memory | sqlite | off)."""
+    if LLM_CACHE_BACKEND == "off":
+        return None
+    if LLM_CACHE_BACKEND == "sqlite":
+        exact: ExactCache = SQLiteCache(LLM_CACHE_PATH)
+    else:
+        exact = InMemoryCache()
+    return LLMResponseCache(exact, SemanticCache(LLM_SEMANTIC_CACHE_THRESHOLD))
@@ -2,62 +2,244 @@
 OpenSearch client and hybrid search (text + vector) for RAG.
 """
 import logging
-from typing import Any, Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
-from opensearchpy import OpenSearch
+import orjson
+from opensearchpy import AsyncOpenSearch, OpenSearch
+from opensearchpy.exceptions import ConnectionError as OpenSearchConnectionError
+from opensearchpy.exceptions import SerializationError
+from opensearchpy.serializer import JSONSerializer
 
-from src.constants import OPENSEARCH_HOST, OPENSEARCH_INDEX, OPENSEARCH_PORT
-from src.utils import setup_logging
+from src.constants import (
+    EMBEDDING_VECTOR_DATA_TYPE,
+    OPENSEARCH_HOST,
+    OPENSEARCH_INDEX,
+    OPENSEARCH_POOL_MAXSIZE,
+    OPENSEARCH_PORT,
+    OPENSEARCH_TIMEOUT,
+)
+from src.utils import CircuitBreaker, EmbeddingVector, loop_local, quantize_int8
 
-setup_logging()
 logger = logging.getLogger(__name__)
 
 
+class OrjsonSerializer(JSONSerializer):
+    """
+    JSONSerializer backed by orjson. Much faster for bulk requests carrying float vectors,
+    and serializes numpy arrays natively (embeddings need no .tolist()).
+    Types orjson does not know fall back to JSONSerializer.default.
+    """
+
+    def dumps(self, data: Any) -> str:
+        if isinstance(data, str):
+            return data
+        try:
+            return orjson.dumps(
+                data,
+                default=self.default,
+                option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS,
+            ).decode("utf-8")
+        except TypeError as e:
+            raise SerializationError(data, e)
+
+    def loads(self, s: Any) -> Any:
+        try:
+            return orjson.loads(s)
+        except orjson.JSONDecodeError as e:
+            raise SerializationError(s, e)
+
+
+# Opened by repeated connection failures/timeouts; searches then return no hits immediately
+_search_breaker = CircuitBreaker("opensearch")
+
+# Process-global client: its connection pool (and keep-alive sockets) is reused by every caller.
+_CLIENT: Optional[OpenSearch] = None
+
+
 def get_opensearch_client() -> OpenSearch:
     """
-    Initializes and returns an OpenSearch client.
+    Returns the process-wide OpenSearch client, creating it on first use.
     """
-    client = OpenSearch(
-        hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}],
-        http_compress=True,
-        timeout=30,
-        max_retries=3,
-        retry_on_timeout=True,
-    )
-    logger.info("OpenSearch client initialized.")
-    return client
+    global _CLIENT
+    if _CLIENT is None:
+        _CLIENT = OpenSearch(
+            hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}],
+            http_compress=True,
+            pool_maxsize=OPENSEARCH_POOL_MAXSIZE,
+            timeout=OPENSEARCH_TIMEOUT,
+            max_retries=3,
+            retry_on_timeout=True,
+            serializer=OrjsonSerializer(),
+        )
+        logger.info("OpenSearch client initialized.")
+    return _CLIENT
+
+
+def get_async_opensearch_client() -> AsyncOpenSearch:
+    """
+    Returns the AsyncOpenSearch client for the running event loop (aiohttp transport),
+    creating it on first use in that loop. Await src.utils.aclose_loop_locals() before the
+    loop ends to close it.
+    """
+
+    def _create() -> AsyncOpenSearch:
+        logger.info("Async OpenSearch client initialized.")
+        return AsyncOpenSearch(
+            hosts=[{"host": OPENSEARCH_HOST, "port": OPENSEARCH_PORT}],
+            http_compress=True,
+            maxsize=OPENSEARCH_POOL_MAXSIZE,
+            timeout=OPENSEARCH_TIMEOUT,
+            max_retries=3,
+            retry_on_timeout=True,
+            serializer=OrjsonSerializer(),
+        )
+
+    return loop_local("opensearch", _create)
+
+
+# Fields returned per hit when the caller does not ask for specific ones. The embedding is
+# never among them: it is left out of stored _source by the index mapping (index_config.json).
+DEFAULT_SOURCE_INCLUDES = ["text", "document_name"]
+
+
+# Hybrid search body as a JSON template built once at import. Per query only the text, vector,
+# k and _source are encoded (with orjson) and substituted; the client sends str bodies as-is.
+_HYBRID_QUERY_TEMPLATE = (
+    '{"_source":%(source)s,"query":{"hybrid":{"queries":['
+    '{"match":{"text":{"query":%(text)s}}},'
+    '{"knn":{"embedding":{"vector":%(vector)s,"k":%(k)d}}}'
+    ']}},"size":%(k)d}'
+)
+_DEFAULT_SOURCE_JSON = orjson.dumps(DEFAULT_SOURCE_INCLUDES).decode("utf-8")
+
+
+def _hybrid_query(
+    query_text: str,
+    query_embedding: EmbeddingVector,
+    top_k: int,
+    source_includes: Optional[List[str]],
+) -> Tuple[str, Dict[str, Any]]:
+    """Build the hybrid search body (JSON) and extra search params shared by all hybrid searches."""
+    vector: EmbeddingVector = query_embedding
+    if EMBEDDING_VECTOR_DATA_TYPE == "byte":
+        # Rank is unchanged by the positive query scale, so use the full int8 range
+        vector = quantize_int8(query_embedding)
+    query_body = _HYBRID_QUERY_TEMPLATE % {
+        "source": (
+            orjson.dumps(source_includes).decode("utf-8")
+            if source_includes is not None
+            else _DEFAULT_SOURCE_JSON
+        ),
+        "text": orjson.dumps(query_text).decode("utf-8"),
+        "vector": orjson.dumps(vector, option=orjson.OPT_SERIALIZE_NUMPY).decode("utf-8"),
+        "k": top_k,
+    }
+    params = {"filter_path": "hits.hits._source"} if source_includes is not None else {}
+    return query_body, params
 
 
 def hybrid_search(
-    query_text: str, query_embedding: List[float], top_k: int = 5
+    query_text: str,
+    query_embedding: EmbeddingVector,
+    top_k: int = 5,
+    source_includes: Optional[List[str]] = None,
 ) -> List[Dict[str, Any]]:
     """
     Performs hybrid search (text match + vector similarity) using the nlp-search-pipeline.
+    If source_includes is given, only those _source fields are returned and the response is
+    filtered down to hits.hits._source (no scores or metadata), keeping the payload small.
+    While OpenSearch is unreachable (repeated connection errors), returns [] without a request.
     """
+    if not _search_breaker.allow():
+        logger.warning("OpenSearch circuit is open; skipping hybrid search.")
+        return []
     client = get_opensearch_client()
-    query_body = {
-        "_source": {"exclude": ["embedding"]},
-        "query": {
-            "hybrid": {
-                "queries": [
-                    {"match": {"text": {"query": query_text}}},
-                    {
-                        "knn": {
-                            "embedding": {
-                                "vector": query_embedding,
-                                "k": top_k,
-                            }
-                        }
-                    },
-                ]
-            }
-        },
-        "size": top_k,
-    }
-    response = client.search(
-        index=OPENSEARCH_INDEX,
-        body=query_body,
-        search_pipeline="nlp-search-pipeline",
-    )
-    logger.info(f"Hybrid search completed for query '{query_text}' with top_k={top_k}.")
-    return response["hits"]["hits"]
+    query_body, params = _hybrid_query(query_text, query_embedding, top_k, source_includes)
+    try:
+        response = client.search(
+            index=OPENSEARCH_INDEX,
+            body=query_body,
+            search_pipeline="nlp-search-pipeline",
+            **params,
+        )
+    except OpenSearchConnectionError:
+        _search_breaker.record_failure()
+        raise
+    _search_breaker.record_success()
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(f"Hybrid search completed for query '{query_text}' with top_k={top_k}.")
+    # With filter_path, an empty result has no "hits" key at all
+    hits: List[Dict[str, Any]] = response.get("hits", {}).get("hits", [])
+    return hits
+
+
+async def ahybrid_search(
+    query_text: str,
+    query_embedding: EmbeddingVector,
+    top_k: int = 5,
+    source_includes: Optional[List[str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Async version of hybrid_search; the request does not block the event loop.
+    See get_async_opensearch_client for closing the client when the loop ends.
+    """
+    if not _search_breaker.allow():
+        logger.warning("OpenSearch circuit is open; skipping hybrid search.")
+        return []
+    client = get_async_opensearch_client()
+    query_body, params = _hybrid_query(query_text, query_embedding, top_k, source_includes)
+    try:
+        response = await client.search(
+            index=OPENSEARCH_INDEX,
+            body=query_body,
+            search_pipeline="nlp-search-pipeline",
+            **params,
+        )
+    except OpenSearchConnectionError:
+        _search_breaker.record_failure()
+        raise
+    _search_breaker.record_success()
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(f"Async hybrid search completed for query '{query_text}' with top_k={top_k}.")
+    hits: List[Dict[str, Any]] = response.get("hits", {}).get("hits", [])
+    return hits
+
+
+def hybrid_search_many(
+    queries: List[Tuple[str, EmbeddingVector]],
+    top_k: int = 5,
+    source_includes: Optional[List[str]] = None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    Runs several hybrid searches (e.g. query reformulations) in one _msearch round trip.
+    queries is a list of (query_text, query_embedding); returns one hit list per query, in order.
+    A sub-query that fails on the server is logged and yields an empty hit list.
+    """
+    if not queries:
+        return []
+    if not _search_breaker.allow():
+        logger.warning("OpenSearch circuit is open; skipping hybrid search.")
+        return [[] for _ in queries]
+    client = get_opensearch_client()
+    # The pipeline is named per sub-request: _msearch has no search_pipeline URL parameter
+    header = {"index": OPENSEARCH_INDEX, "search_pipeline": "nlp-search-pipeline"}
+    body: List[Any] = []
+    for query_text, query_embedding in queries:
+        query_body, _ = _hybrid_query(query_text, query_embedding, top_k, source_includes)
+        body.extend((header, query_body))
+    try:
+        response = client.msearch(body=body)
+    except OpenSearchConnectionError:
+        _search_breaker.record_failure()
+        raise
+    _search_breaker.record_success()
+    results: List[List[Dict[str, Any]]] = []
+    for (query_text, _), item in zip(queries, response.get("responses", [])):
+        if "error" in item:
+            logger.warning(f"Hybrid search failed for query '{query_text}': {item['error']}")
+            results.append([])
+        else:
+            results.append(item.get("hits", {}).get("hits", []))
+    if logger.isEnabledFor(logging.INFO):
+        logger.info(f"Multi hybrid search completed for {len(queries)} queries with top_k={top_k}.")
+    return results
@@ -0,0 +1,107 @@
+"""
+PDF text extraction for ingestion. Uses pypdfium2 (fast, PDFium-based) and falls back to PyPDF2.
+Extracted text is cached on disk by file content hash (see PDF_TEXT_CACHE_DIR).
+"""
+import hashlib
+import logging
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Tuple
+
+from src.constants import PDF_TEXT_CACHE_DIR
+
+logger = logging.getLogger(__name__)
+
+
+def _extract_text_pypdf2(path: str) -> str:
+    """Extract text with PyPDF2 (slower; used only when pypdfium2 fails)."""
+    from PyPDF2 import PdfReader
+
+    reader = PdfReader(path)
+    return "".join([page.extract_text() or "" for page in reader.pages])
+
+
+def _normalize_text(text: str) -> str:
+    """
+    Normalize PDFium text to what the rest of ingestion expects: "\r\n" / "\r" line breaks
+    become "\n", and words hyphenated at a line end (PDFium marks the hyphen with U+FFFE)
+    are joined back together, e.g. "exam\ufffe\r\nple" -> "example".
+    """
+    text = re.sub("\ufffe(?:\r\n|\r|\n)?", "", text)
+    return text.replace("\r\n", "\n").replace("\r", "\n")
+
+
+def _file_sha256(path: str) -> str:
+    """SHA-256 hex digest of a file, read in 1MB blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def extract_text(path: str) -> str:
+    """
+    Extract the text of every page of a PDF, pages joined by newlines ("\n" line breaks,
+    line-end hyphenation removed). Returns the cached text if a file with identical bytes
+    was extracted before.
+    Raises if neither pypdfium2 nor PyPDF2 can read the file.
+    """
+    cache_path = os.path.join(PDF_TEXT_CACHE_DIR, f"{_file_sha256(path)}.txt")
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            logger.info(f"Using cached text for {path}.")
+            # Also normalizes text cached before normalization was added
+            return _normalize_text(f.read())
+    except FileNotFoundError:
+        pass
+
+    text = _normalize_text(_extract_text_uncached(path))
+    try:
+        os.makedirs(PDF_TEXT_CACHE_DIR, exist_ok=True)
+        # Write then rename so parallel extractions never see a partial cache file
+        tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(text)
+        os.replace(tmp_path, cache_path)
+    except OSError as e:
+        logger.warning(f"Could not cache extracted text for {path}: {e}")
+    return text
+
+
+def _extract_text_uncached(path: str) -> str:
+    """Extract text with pypdfium2, falling back to PyPDF2."""
+    try:
+        import pypdfium2 as pdfium
+
+        pdf = pdfium.PdfDocument(path)
+        try:
+            return "\n".join(page.get_textpage().get_text_range() for page in pdf)
+        finally:
+            pdf.close()
+    except Exception as e:
+        logger.warning(f"pypdfium2 could not read {path} ({e}); falling back to PyPDF2.")
+        return _extract_text_pypdf2(path)
+
+
+def _extract_text_or_error(path: str) -> Tuple[str, Optional[str]]:
+    """extract_text that returns (text, None) on success and ("", error message) on failure."""
+    try:
+        return extract_text(path), None
+    except Exception as e:
+        return "", str(e)
+
+
+def extract_texts(paths: List[str]) -> List[Tuple[str, Optional[str]]]:
+    """
+    Extract text from several PDFs in parallel, one worker process per CPU core.
+    Returns one (text, error) pair per path, in the same order; error is None on success.
+    """
+    if len(paths) <= 1:
+        return [_extract_text_or_error(path) for path in paths]
+    max_workers = min(len(paths), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        results = list(executor.map(_extract_text_or_error, paths))
+    logger.info(f"Extracted text from {len(paths)} PDFs with {max_workers} worker processes.")
+    return results
@@ -1,16 +1,53 @@
 # src/utils.py
 
+import asyncio
+import collections
+import inspect
 import logging
 import re
-from typing import List
+import threading
+import time
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypeVar,
+    Union,
+    cast,
+)
 
 from src.constants import LOG_FILE_PATH
 
+if TYPE_CHECKING:
+    import numpy as np
+
+T = TypeVar("T")
+
+# An embedding as passed between modules: a float list or a numpy row (e.g. get_query_embedding)
+EmbeddingVector = Union[Sequence[float], "np.ndarray"]
+
+# Per-event-loop registry for async clients (see loop_local): loop -> name -> (object, closer).
+# Plain dict, not weak: the clients reference their loop, so weak keys would never be freed.
+_loop_locals: Dict[
+    asyncio.AbstractEventLoop, Dict[str, Tuple[Any, Optional[Callable[[Any], Awaitable[Any]]]]]
+] = {}
+_loop_locals_lock = threading.Lock()
+
 
 def setup_logging() -> None:
     """
     Configures logging settings for the application, specifying log file, format, and level.
+    Called by the app entry points (Welcome.py and the pages); does nothing if the root
+    logger already has handlers, so repeated calls never add duplicate handlers.
     """
+    if logging.getLogger().handlers:
+        return
     logging.basicConfig(
         filename=LOG_FILE_PATH,
         filemode="a",
@@ -19,6 +56,104 @@ def setup_logging() -> None:
     )
 
 
+def loop_local(
+    name: str,
+    factory: Callable[[], T],
+    aclose: Optional[Callable[[T], Awaitable[Any]]] = None,
+) -> T:
+    """
+    Return the object registered under name for the running event loop, creating it with
+    factory on first use. Async HTTP clients are bound to the loop they first ran on, so they
+    can be reused within one loop (e.g. a FastAPI worker) but must not be shared across loops.
+
+    Callers that own the loop must await aclose_loop_locals() before it ends (at the end of
+    the coroutine given to asyncio.run, or in a FastAPI shutdown/lifespan handler); it closes
+    the objects with aclose (default: their close() method). Registries of loops that were
+    closed without it are dropped on the next call, but their clients are not closed.
+    """
+    loop = asyncio.get_running_loop()
+    with _loop_locals_lock:
+        for stale in [other for other in _loop_locals if other.is_closed()]:
+            del _loop_locals[stale]
+        registry = _loop_locals.setdefault(loop, {})
+        if name not in registry:
+            registry[name] = (factory(), cast(Optional[Callable[[Any], Awaitable[Any]]], aclose))
+        return cast(T, registry[name][0])
+
+
+async def aclose_loop_locals() -> None:
+    """Close and forget every object registered with loop_local for the running event loop."""
+    with _loop_locals_lock:
+        registry = _loop_locals.pop(asyncio.get_running_loop(), {})
+    for name, (obj, aclose) in registry.items():
+        try:
+            result = aclose(obj) if aclose is not None else obj.close()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logging.getLogger(__name__).warning(f"Could not close loop-local '{name}': {e}")
+
+
+def quantize_int8(vectors: Any, max_abs: Optional[float] = None) -> "np.ndarray":
+    """
+    Quantizes float vectors to int8 for byte k-NN fields: components are scaled by 127 / max_abs,
+    rounded and clipped to [-128, 127]. max_abs defaults to the largest absolute component.
+    Unit-normalized embeddings can use max_abs=1.0 so every document shares one scale.
+    """
+    import numpy as np
+
+    v = np.asarray(vectors, dtype=np.float32)
+    if max_abs is None:
+        max_abs = float(np.abs(v).max()) or 1.0
+    return np.clip(np.round(v * (127.0 / max_abs)), -128, 127).astype(np.int8)
+
+
+class CircuitBreaker:
+    """
+    Fails fast while a backend is down: after max_failures failures within window_seconds the
+    breaker opens and allow() returns False for open_seconds, instead of every request waiting
+    for its own timeout. A success clears the failure history. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_failures: int = 3,
+        window_seconds: float = 30.0,
+        open_seconds: float = 30.0,
+    ) -> None:
+        self.name = name
+        self.max_failures = max_failures
+        self.window_seconds = window_seconds
+        self.open_seconds = open_seconds
+        self._failures: "collections.deque[float]" = collections.deque()
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """True if a request may be sent (breaker closed, or its open period has passed)."""
+        return time.monotonic() >= self._open_until
+
+    def record_failure(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._failures.append(now)
+            while self._failures and now - self._failures[0] > self.window_seconds:
+                self._failures.popleft()
+            if len(self._failures) >= self.max_failures:
+                self._open_until = now + self.open_seconds
+                self._failures.clear()
+                logging.getLogger(__name__).warning(
+                    f"Circuit breaker '{self.name}' opened for {self.open_seconds:.0f}s "
+                    f"after {self.max_failures} failures."
+                )
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures.clear()
+            self._open_until = 0.0
+
+
 def clean_text(text: str) -> str:
     """
     Cleans OCR-extracted text by removing unnecessary newlines, hyphens, and correcting common OCR errors.
@@ -108,3 +243,84 @@ def chunk_text_by_characters(
         f"Text split into {len(chunks)} character-based chunks (size={chunk_size}, overlap={overlap})."
     )
     return chunks
+
+
+def _split_by_tokens(
+    text: str, tokenizer: Any, max_tokens: int, separators: Sequence[str]
+) -> List[str]:
+    """
+    Recursively split text on the first separator present until every piece fits in
+    max_tokens. Separators stay attached to the end of each piece. Pieces with no
+    separator left are cut on token boundaries.
+    """
+    if len(tokenizer.encode(text, add_special_tokens=False)) <= max_tokens:
+        return [text]
+    for i, separator in enumerate(separators):
+        if separator in text:
+            parts = text.split(separator)
+            parts = [part + separator for part in parts[:-1]] + [parts[-1]]
+            pieces: List[str] = []
+            for part in parts:
+                if part:
+                    pieces.extend(
+                        _split_by_tokens(part, tokenizer, max_tokens, separators[i + 1 :])
+                    )
+            return pieces
+    ids = tokenizer.encode(text, add_special_tokens=False)
+    return [
+        tokenizer.decode(ids[start : start + max_tokens])
+        for start in range(0, len(ids), max_tokens)
+    ]
+
+
+def chunk_text_by_tokens(
+    text: str,
+    tokenizer: Any,
+    max_tokens: int,
+    overlap: int = 32,
+    separators: Sequence[str] = ("\n\n", "\n", ". ", " "),
+) -> List[str]:
+    """
+    Splits text into chunks of at most max_tokens embedding-model tokens (for RAG indexing).
+    Like LangChain's RecursiveCharacterTextSplitter: text is split on paragraph, line,
+    sentence, then word boundaries, and the pieces are merged back into chunks as large
+    as the budget allows. Whitespace-only chunks are dropped.
+
+    Args:
+        text: The text to split.
+        tokenizer: Hugging Face tokenizer of the embedding model (SentenceTransformer.tokenizer).
+        max_tokens: Max tokens per chunk.
+        overlap: Approximate tokens repeated from the end of one chunk at the start of the next.
+        separators: Split points to try, from coarsest to finest.
+
+    Returns:
+        List of text chunks.
+    """
+    text = clean_text(text)
+    if not text:
+        return []
+    pieces = _split_by_tokens(text, tokenizer, max_tokens, separators)
+    lengths = [len(ids) for ids in tokenizer(pieces, add_special_tokens=False)["input_ids"]]
+
+    chunks = []
+    current: List[str] = []
+    current_lengths: List[int] = []
+    for piece, length in zip(pieces, lengths):
+        if current and sum(current_lengths) + length > max_tokens:
+            chunks.append("".join(current).strip())
+            # Carry trailing pieces into the next chunk as overlap
+            while current and (
+                sum(current_lengths) > overlap
+                or sum(current_lengths) + length > max_tokens
+            ):
+                current.pop(0)
+                current_lengths.pop(0)
+        current.append(piece)
+        current_lengths.append(length)
+    if current:
+        chunks.append("".join(current).strip())
+    chunks = [chunk for chunk in chunks if chunk]
+    logging.info(
+        f"Text split into {len(chunks)} token-based chunks (max_tokens={max_tokens}, overlap={overlap})."
+    )
+    return chunks